@@ -0,0 +1 @@
+"""Benchmark suite for meteorflux, see `run.py`."""
@@ -0,0 +1,38 @@
+"""Benchmarks of the graph rendering."""
+from meteorflux import graph, profile, util
+
+
+def _profiles(context):
+    context.ensure_loaded()
+    start, stop = context.window()
+    context.videoprofile = profile.VideoProfile(context.db, 'PER',
+                                                start.isoformat(),
+                                                stop.isoformat(),
+                                                min_meteors=20)
+    context.avgprofiles = [profile.AvgVideoProfile(context.db, 'PER', [year],
+                                                   util.sollon(start),
+                                                   util.sollon(stop),
+                                                   min_meteors=20)
+                           for year in context.manifest['years']]
+
+
+def time_videograph_plot(context):
+    graph.VideoGraph(context.videoprofile).plot()
+    graph.plt.close('all')
+
+
+def time_videograph_save(context):
+    mygraph = graph.VideoGraph(context.videoprofile)
+    mygraph.plot()
+    mygraph.save()
+
+
+def time_solvideograph_save(context):
+    mygraph = graph.SolVideoGraph(context.avgprofiles)
+    mygraph.plot()
+    mygraph.save()
+
+
+for func in (time_videograph_plot, time_videograph_save,
+             time_solvideograph_save):
+    func.setup = _profiles
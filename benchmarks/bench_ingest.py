@@ -0,0 +1,24 @@
+"""Benchmarks of the MetRec parser and the COPY ingestion."""
+from meteorflux import metrec
+
+
+def time_parse(context):
+    """Parse all synthetic FLX files into dictionaries."""
+    for path in context.zips:
+        metrec.MetRecData(path).get_json()
+
+
+def _parse_all(context):
+    context.reset()
+    context.parsed = [metrec.MetRecData(path).get_json()
+                      for path in context.zips]
+
+
+def time_copy(context):
+    """COPY the pre-parsed data set into an empty flux table."""
+    for data in context.parsed:
+        context.db.ingest_json(data)
+    context.db.commit()
+    del context.parsed
+
+time_copy.setup = _parse_all
@@ -0,0 +1,70 @@
+"""Benchmarks of the SQL profile functions and the profile classes."""
+from werkzeug.datastructures import MultiDict
+
+from meteorflux import app, profile, util
+
+ARGS = (20, 20000., 1., 24., 10., -0.1, 1.5, 2.2)
+
+
+def _sollongs(context):
+    start, stop = context.window()
+    return util.sollon(start), util.sollon(stop)
+
+
+def _load(context):
+    context.ensure_loaded()
+
+
+def time_sql_videoprofile(context):
+    start, stop = context.window()
+    context.db.query("""SELECT * FROM VideoProfile(%s, %s, %s, %s, %s,
+                                    '%s hours'::interval, '%s hours'::interval,
+                                    %s, %s, %s, %s)""",
+                     ('PER', start, stop) + ARGS)
+
+
+def time_sql_solvideoprofile(context):
+    start, stop = _sollongs(context)
+    context.db.query("""SELECT * FROM SolVideoProfile(%s, %s, %s, %s, %s, %s,
+                                    %s, %s, %s, %s, %s, %s)""",
+                     ('PER', context.manifest['years'][0], start, stop) + ARGS)
+
+
+def time_sql_avgvideoprofile(context):
+    start, stop = _sollongs(context)
+    context.db.query("""SELECT * FROM AvgVideoProfile(%s, %s::int[], %s, %s,
+                                    %s, %s, %s, %s, %s, %s, %s, %s)""",
+                     ('PER', context.manifest['years'], start, stop) + ARGS)
+
+
+def time_python_videoprofile(context):
+    """Profile class, including the extraction of all fields."""
+    start, stop = context.window()
+    myprofile = profile.VideoProfile(context.db, 'PER', start.isoformat(),
+                                     stop.isoformat(), min_meteors=20)
+    for key in ('time', 'solarlon', 'flux', 'e_flux', 'zhr'):
+        myprofile.field(key)
+
+
+def time_python_avgvideoprofile(context):
+    start, stop = _sollongs(context)
+    myprofile = profile.AvgVideoProfile(context.db, 'PER',
+                                        context.manifest['years'],
+                                        start, stop, min_meteors=20)
+    for key in ('solarlon', 'flux', 'e_flux', 'zhr'):
+        myprofile.field(key)
+
+
+def time_compute_flux(context):
+    """Complete /api/flux response, including the graph."""
+    start, stop = context.window()
+    params = app.parse_flux_args(MultiDict({'shower': 'PER',
+                                            'start': start.isoformat(),
+                                            'stop': stop.isoformat()}))
+    app.compute_flux(context.db, params)
+
+
+for func in (time_sql_videoprofile, time_sql_solvideoprofile,
+             time_sql_avgvideoprofile, time_python_videoprofile,
+             time_python_avgvideoprofile, time_compute_flux):
+    func.setup = _load
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Run the benchmark suite against a local PostgreSQL database.
+
+Usage: python -m benchmarks.run [--stations N] [--years Y1,Y2] [--nights N]
+                                [--repeat N] [--filter NAME] [--threshold F]
+
+A synthetic data set of the requested size is generated (or re-used) in
+`--datadir`, the benchmarks are run against `config.DBINFO_BENCHMARK`, and
+the results are stored in `benchmarks/results/<commit>.json`.  Benchmarks
+which are slower than in the most recent results of another commit are
+flagged, and the exit status is non-zero if any are found.
+"""
+from __future__ import print_function
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+from meteorflux import config
+
+from . import suite, synthetic
+
+
+def get_datadir(args):
+    """Returns a directory containing the requested synthetic data set."""
+    years = [int(y) for y in args.years.split(',')]
+    manifest = os.path.join(args.datadir, 'manifest.json')
+    if os.path.exists(manifest):
+        with open(manifest, 'r') as myfile:
+            existing = json.load(myfile)
+        if (existing['stations'] == args.stations
+                and existing['years'] == years
+                and existing['nights'] == args.nights):
+            return args.datadir
+    print('Generating synthetic data in {0}'.format(args.datadir))
+    synthetic.generate(args.datadir, stations=args.stations,
+                       years=years, nights=args.nights)
+    return args.datadir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dbinfo', default=config.DBINFO_BENCHMARK)
+    parser.add_argument('--datadir', default=os.path.join(
+                            tempfile.gettempdir(), 'meteorflux-benchmark'))
+    parser.add_argument('--stations', type=int, default=5)
+    parser.add_argument('--years', default='2012,2013')
+    parser.add_argument('--nights', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default=None,
+                        help='only run benchmarks containing this string')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slow-down flagged as a regression')
+    args = parser.parse_args()
+
+    context = suite.Context(args.dbinfo, get_datadir(args))
+    print('{0} files, {1} flux records'.format(context.manifest['files'],
+                                               context.manifest['rows']))
+    results = suite.run(suite.collect(args.filter), context, args.repeat)
+    context.close()
+
+    filename = suite.save(results, context.manifest)
+    print('Results written to {0}'.format(filename))
+    baseline = suite.load_baseline(filename, context.manifest)
+    if baseline is None:
+        return 0
+    regressions = suite.compare(results, baseline, args.threshold)
+    for name, old, new in regressions:
+        print('REGRESSION {0}: {1:.4f}s -> {2:.4f}s (baseline {3})'.format(
+                                        name, old, new, baseline['revision']))
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Minimal benchmark framework.
+
+Benchmarks are functions named `time_*` in the `bench_*.py` modules of this
+directory.  Each is called with a `Context` and timed `repeat` times; if the
+function has a `setup` attribute, it is called (untimed) before each
+repetition.  Results are stored as JSON, one file per commit, such that
+regressions between commits can be flagged.
+"""
+from __future__ import division
+
+import os
+import glob
+import json
+import time
+import inspect
+import datetime
+import importlib
+import subprocess
+import numpy as np
+
+from meteorflux import db, metrec
+
+from . import synthetic
+
+PATH = os.path.dirname(os.path.realpath(__file__))
+RESULTSDIR = os.path.join(PATH, 'results')
+
+
+class Context(object):
+    """State shared by the benchmarks: the database and the data set."""
+
+    def __init__(self, dbinfo, datadir):
+        self.dbinfo = dbinfo
+        self.datadir = datadir
+        with open(os.path.join(datadir, 'manifest.json'), 'r') as myfile:
+            self.manifest = json.load(myfile)
+        self.zips = sorted(glob.glob(os.path.join(datadir, '*.zip')))
+        self.db = db.FluxDB(dbinfo, autocommit=False)
+
+    def reset(self):
+        """Creates an empty flux table."""
+        self.db.setup()
+        self.db.commit()
+
+    def ensure_loaded(self):
+        """Makes sure the flux table contains the full synthetic data set."""
+        count = None
+        if self.db.query("SELECT to_regclass('flux')")[0][0] is not None:
+            count = self.db.query('SELECT COUNT(*) FROM flux')[0][0]
+        if count != self.manifest['rows']:
+            self.reset()
+            for path in self.zips:
+                metrec.ingest_zip(path, self.db, remove_old=False)
+            self.db.commit()
+            self.db.cur.execute('ANALYZE flux')
+            self.db.commit()
+
+    def window(self, shower='PER', year=None):
+        """Returns the (start, stop) datetimes of the data around a peak."""
+        if year is None:
+            year = self.manifest['years'][0]
+        month, day = synthetic.SHOWERS[shower]['peak']
+        half = datetime.timedelta(self.manifest['nights'] / 2. + 1)
+        peak = datetime.datetime(year, month, day, 12)
+        return peak - half, peak + half
+
+    def close(self):
+        self.db.close()
+
+
+def collect(pattern=None):
+    """Returns the (name, function) pairs of all benchmarks.
+
+    Parameters
+    ----------
+    pattern : string (optional)
+        Only return the benchmarks whose name contains this string.
+    """
+    result = []
+    for filename in sorted(glob.glob(os.path.join(PATH, 'bench_*.py'))):
+        modname = os.path.splitext(os.path.basename(filename))[0]
+        module = importlib.import_module('benchmarks.' + modname)
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('time_') and func.__module__ == module.__name__:
+                fullname = '{0}.{1}'.format(modname[6:], name[5:])
+                if pattern is None or pattern in fullname:
+                    result.append((fullname, func))
+    return result
+
+
+def run(benchmarks, context, repeat=3):
+    """Runs the benchmarks and returns a dict of timing statistics."""
+    results = {}
+    for name, func in benchmarks:
+        timings = []
+        for i in range(repeat):
+            if hasattr(func, 'setup'):
+                func.setup(context)
+            start = time.time()
+            func(context)
+            timings.append(time.time() - start)
+        results[name] = {'min': min(timings),
+                         'median': float(np.median(timings)),
+                         'repeat': repeat}
+        print('{0:40s} {1:10.4f}s'.format(name, results[name]['median']))
+    return results
+
+
+def git_revision():
+    """Returns the current commit hash, with a "+" suffix if dirty."""
+    try:
+        rev = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                      cwd=PATH).decode().strip()
+        dirty = subprocess.call(['git', 'diff', '--quiet', 'HEAD'], cwd=PATH)
+        return rev + ('+' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save(results, manifest, resultsdir=RESULTSDIR):
+    """Stores the results of a run as JSON and returns the filename."""
+    if not os.path.isdir(resultsdir):
+        os.makedirs(resultsdir)
+    revision = git_revision()
+    document = {'revision': revision,
+                'date': datetime.datetime.utcnow().isoformat(),
+                'manifest': manifest,
+                'benchmarks': results}
+    filename = os.path.join(resultsdir, '{0}.json'.format(revision))
+    with open(filename, 'w') as myfile:
+        json.dump(document, myfile, indent=2, sort_keys=True)
+    return filename
+
+
+def load_baseline(current, manifest, resultsdir=RESULTSDIR):
+    """Returns the most recent results of another commit, or None.
+
+    Only results obtained on an identical synthetic data set are considered.
+    """
+    documents = []
+    for filename in glob.glob(os.path.join(resultsdir, '*.json')):
+        if os.path.abspath(filename) == os.path.abspath(current):
+            continue
+        with open(filename, 'r') as myfile:
+            document = json.load(myfile)
+        if document['manifest'] == manifest:
+            documents.append(document)
+    if len(documents) == 0:
+        return None
+    return max(documents, key=lambda doc: doc['date'])
+
+
+def compare(results, baseline, threshold=0.2):
+    """Returns the benchmarks which got slower than `baseline`.
+
+    Parameters
+    ----------
+    threshold : float
+        Relative slow-down of the median above which a benchmark is
+        flagged as a regression.
+
+    Returns
+    -------
+    List of (name, old median, new median) tuples.
+    """
+    regressions = []
+    for name, stats in sorted(results.items()):
+        try:
+            old = baseline['benchmarks'][name]['median']
+        except KeyError:
+            continue
+        if stats['median'] > (1 + threshold) * old:
+            regressions.append((name, old, stats['median']))
+    return regressions
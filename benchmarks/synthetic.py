@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Generate synthetic MetRec flux data for benchmarking.
+
+Writes one ZIP file per night and station, named like the real data
+(e.g. "20120812_STA003.zip"), containing one FLX file per active shower
+in either the MetRec FLX 1.0 or 1.1 format.  Meteor counts are drawn from
+a Poisson distribution following a double-exponential activity profile
+around each shower's peak, and magnitudes follow the population index.
+
+Usage: synthetic.py OUTDIR [--stations N] [--years 2012,2013] [--nights N]
+
+The number of rows is roughly stations x nights x showers x 600, hence
+100 stations observing 40 nights of 5 showers for 10 years produces
+about 100 million flux records.
+"""
+from __future__ import division
+
+import os
+import json
+import zipfile
+import argparse
+import datetime
+import numpy as np
+
+from meteorflux import util
+
+# Sun's mean motion in solar longitude per minute [deg]
+SOLLONG_PER_MINUTE = 360. / 525949.2
+# Observing window of every night: 19:00 UT + 600 minutes
+NIGHT_START_HOUR = 19
+NIGHT_MINUTES = 600
+
+SHOWERS = {
+    'QUA': {'name': 'Quadrantids', 'r': 2.1, 'peak': (1, 3), 'days': 3,
+            'flux': 50., 'slope': 1.8, 'ra': 15.33, 'dec': 49.5, 'vel': 41},
+    'LYR': {'name': 'Lyrids', 'r': 2.1, 'peak': (4, 22), 'days': 5,
+            'flux': 10., 'slope': 0.5, 'ra': 18.07, 'dec': 34.0, 'vel': 49},
+    'ETA': {'name': 'eta-Aquarids', 'r': 2.4, 'peak': (5, 5), 'days': 10,
+            'flux': 15., 'slope': 0.1, 'ra': 22.53, 'dec': -1.0, 'vel': 66},
+    'PER': {'name': 'Perseids', 'r': 2.2, 'peak': (8, 12), 'days': 15,
+            'flux': 40., 'slope': 0.3, 'ra': 3.2, 'dec': 58.0, 'vel': 59},
+    'ORI': {'name': 'Orionids', 'r': 2.5, 'peak': (10, 21), 'days': 10,
+            'flux': 12., 'slope': 0.2, 'ra': 6.33, 'dec': 16.0, 'vel': 66},
+    'LEO': {'name': 'Leonids', 'r': 2.5, 'peak': (11, 17), 'days': 5,
+            'flux': 10., 'slope': 0.5, 'ra': 10.27, 'dec': 22.0, 'vel': 71},
+    'GEM': {'name': 'Geminids', 'r': 2.6, 'peak': (12, 14), 'days': 6,
+            'flux': 60., 'slope': 0.4, 'ra': 7.47, 'dec': 33.0, 'vel': 35},
+    'SPO': {'name': 'Sporadic', 'r': 3.0, 'peak': None, 'days': None,
+            'flux': 8., 'slope': 0., 'ra': 0., 'dec': 0., 'vel': 30},
+}
+DEFAULT_SHOWERS = ['QUA', 'LYR', 'PER', 'GEM']
+
+
+def peak_sollong(code, year):
+    """Returns the solar longitude of a shower's peak in a given year."""
+    month, day = SHOWERS[code]['peak']
+    return util.sollon(datetime.datetime(year, month, day, 0, 0))
+
+
+def flx_header(code, date, fileformat):
+    """Returns the header lines of a FLX file."""
+    shower = SHOWERS[code]
+    lines = ['Format           MetRec FLX {0}'.format(fileformat),
+             'Date             {0}'.format(date.strftime('%Y%m%d')),
+             'Shower           {0}'.format(shower['name']),
+             'IMO Code         {0}'.format(code),
+             'Right Ascension  {0:.2f} h'.format(shower['ra']),
+             'Declination      {0:.1f} \xb0'.format(shower['dec']),
+             'Velocity         {0} km/s'.format(shower['vel'])]
+    if fileformat == '1.0':
+        lines += ['Population Index {0}'.format(shower['r']),
+                  '',
+                  'Time   SolLong   Teff   LMStar Alt   Dist  Vel   MLAlt '
+                  'LMMet    ECA    Met Bright',
+                  '[UT]    [deg]    [min]   [mag] [\xb0]   [\xb0]  [\xb0/s]  '
+                  '[km]  [mag]  [km^2*h] [#] [mag] ',
+                  '=' * 81]
+    else:
+        lines += ['',
+                  'Time   SolLong   Teff   LMStar Alt   Dist  Vel   MLAlt '
+                  'LMMet  PPI  PowExp    ECA    Met Bright',
+                  '[UT]    [deg]    [min]   [mag] [\xb0]   [\xb0]  [\xb0/s]  '
+                  '[km]  [mag]               [km^2*h] [#] [mag] ',
+                  '=' * 94]
+    return lines
+
+
+def flx_rows(rng, station, code, date, fileformat, year):
+    """Returns the data lines of a FLX file for one night and shower.
+
+    Parameters
+    ----------
+    rng : numpy.random.RandomState
+
+    station : dict
+        Station properties, with keys 'lm' (limiting magnitude),
+        'eca' (collection area scale) and 'lat' (latitude factor).
+    """
+    shower = SHOWERS[code]
+    start = datetime.datetime(date.year, date.month, date.day,
+                              NIGHT_START_HOUR, 0)
+    minute = np.arange(NIGHT_MINUTES)
+    sollong = (util.sollon(start) + minute * SOLLONG_PER_MINUTE) % 360.
+
+    # Observing conditions: clouds roll in for part of some nights
+    teff = np.clip(rng.normal(0.97, 0.03, NIGHT_MINUTES), 0.7, 1.0)
+    clear = np.ones(NIGHT_MINUTES, dtype=bool)
+    if rng.rand() < 0.3:
+        begin = rng.randint(NIGHT_MINUTES)
+        clear[begin:begin + rng.randint(30, 300)] = False
+    lmstar = np.where(clear,
+                      station['lm'] + rng.normal(0, 0.15, NIGHT_MINUTES), 0.)
+    lmmet = np.where(clear, lmstar - 1.0, 0.)
+
+    # Radiant rises in the course of the night
+    phase = rng.uniform(-0.3, 0.3)
+    alt = (station['lat'] * shower['dec'] / 2. + 45.
+           + 40. * np.sin(np.pi * (minute / NIGHT_MINUTES + phase - 0.5)))
+    dist = 90. - alt + rng.normal(0, 2, NIGHT_MINUTES)
+    vel = np.full(NIGHT_MINUTES, shower['vel'] / 10.)
+    mlalt = np.full(NIGHT_MINUTES, 105.)
+    sinalt = np.sin(np.radians(np.clip(alt, 0, 90)))
+    eca = np.where(clear & (alt > 0),
+                   station['eca'] * teff * sinalt
+                   * 10 ** (0.2 * (lmmet - 2.)), 0.)
+
+    # Meteors from a double-exponential activity profile
+    if shower['peak'] is None:
+        flux = np.full(NIGHT_MINUTES, shower['flux'])
+    else:
+        dsol = sollong - peak_sollong(code, year)
+        flux = shower['flux'] * 10 ** (-shower['slope'] * np.abs(dsol)) + 0.5
+    met = rng.poisson(flux / 1000. * eca * sinalt ** 0.5)
+
+    lines = []
+    for i in range(NIGHT_MINUTES):
+        t = start + datetime.timedelta(minutes=int(i))
+        line = '{0:%H:%M}  {1:8.4f}  {2:.3f}  {3:5.2f} {4:5.1f} {5:5.1f}' \
+               ' {6:5.1f}  {7:5.1f}  {8:4.2f}'.format(
+                    t, sollong[i], teff[i], lmstar[i], alt[i], dist[i],
+                    vel[i], mlalt[i], lmmet[i])
+        if fileformat != '1.0':
+            line += '  3.0  {0:6.3f}'.format(np.log10(max(eca[i], 1e-3)) - 4.)
+        line += '  {0:6.2f}  {1:4d} '.format(eca[i], met[i])
+        if met[i] > 0:
+            mags = lmmet[i] - rng.exponential(1. / np.log(shower['r']),
+                                              met[i])
+            line += ' '.join('{0:5.1f}'.format(m) for m in mags)
+        lines.append(line)
+    return lines
+
+
+def write_zip(path, rng, station, date, showers, fileformat, year):
+    """Writes a single night/station ZIP file.
+
+    Returns
+    -------
+    Number of flux records written.
+    """
+    rows = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as myzip:
+        for code in showers:
+            lines = flx_header(code, date, fileformat)
+            data = flx_rows(rng, station, code, date, fileformat, year)
+            rows += len(data)
+            flx = '\r\n'.join(lines + data) + '\r\n'
+            myzip.writestr('{0:%m%d}_{1}.FLX'.format(date, code),
+                           flx.encode('ISO-8859-1'))
+    return rows
+
+
+def active_showers(showers, date):
+    """Returns the showers which are active on a given date."""
+    result = []
+    for code in showers:
+        shower = SHOWERS[code]
+        if shower['peak'] is None:
+            result.append(code)
+            continue
+        peak = datetime.date(date.year, *shower['peak'])
+        if abs((date - peak).days) <= shower['days']:
+            result.append(code)
+    return result
+
+
+def generate(outdir, stations=10, years=(2012, 2013), nights=5,
+             showers=DEFAULT_SHOWERS, formats=('1.0', '1.1'), seed=42):
+    """Generates a synthetic data set.
+
+    Parameters
+    ----------
+    outdir : string
+        Directory in which the ZIP files and a `manifest.json` are written.
+
+    stations : int
+        Number of stations.
+
+    years : list of int
+
+    nights : int
+        Number of nights per shower and year, centred on the peak.
+
+    showers : list of str
+        IMO codes of the showers; sporadics are always included.
+
+    formats : list of str
+        FLX formats, assigned to the stations in turn.
+
+    Returns
+    -------
+    The manifest, i.e. a dict describing the data set.
+    """
+    rng = np.random.RandomState(seed)
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    showers = [code for code in showers if code != 'SPO'] + ['SPO']
+    mystations = [{'code': 'STA{0:03d}'.format(i),
+                   'lm': rng.uniform(3.0, 5.0),
+                   'eca': rng.uniform(1.0, 3.0),
+                   'lat': rng.uniform(0.2, 1.0),
+                   'format': formats[i % len(formats)]}
+                  for i in range(stations)]
+
+    rows = 0
+    files = 0
+    for year in years:
+        dates = set()
+        for code in showers:
+            if SHOWERS[code]['peak'] is None:
+                continue
+            peak = datetime.date(year, *SHOWERS[code]['peak'])
+            for offset in range(-(nights // 2), nights - nights // 2):
+                dates.add(peak + datetime.timedelta(offset))
+        for date in sorted(dates):
+            night_showers = active_showers(showers, date)
+            for station in mystations:
+                path = os.path.join(outdir, '{0:%Y%m%d}_{1}.zip'.format(
+                                                    date, station['code']))
+                rows += write_zip(path, rng, station, date, night_showers,
+                                  station['format'], year)
+                files += 1
+
+    manifest = {'stations': stations,
+                'years': list(years),
+                'nights': nights,
+                'showers': showers,
+                'formats': list(formats),
+                'seed': seed,
+                'files': files,
+                'rows': rows}
+    with open(os.path.join(outdir, 'manifest.json'), 'w') as myfile:
+        json.dump(manifest, myfile, indent=2)
+    return manifest
+
+
+#######
+# MAIN
+#######
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('outdir')
+    parser.add_argument('--stations', type=int, default=10)
+    parser.add_argument('--years', default='2012,2013')
+    parser.add_argument('--nights', type=int, default=5)
+    parser.add_argument('--showers', default=','.join(DEFAULT_SHOWERS))
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    manifest = generate(args.outdir,
+                        stations=args.stations,
+                        years=[int(y) for y in args.years.split(',')],
+                        nights=args.nights,
+                        showers=args.showers.split(','),
+                        seed=args.seed)
+    print('Wrote {files} files containing {rows} flux records.'.format(
+                                                                **manifest))
@@ -13,6 +13,9 @@ end -- UT
 gamma -- 
 binning -- TBD
 
+/api/metrics
+GET -- per-stage latency histograms in the Prometheus text format
+
 Returns
 -------
 JSON objects with flux data and link to graph.
@@ -20,11 +23,27 @@ JSON objects with flux data and link to graph.
 from flask import Flask, request, json, send_from_directory
 from astropy import time
 
-from . import db, profile, graph, util, config
+from . import db, profile, graph, util, config, cache, metrics
 
 fluxapp = Flask('meteorflux', static_url_path='')
 
 
+@fluxapp.before_request
+def start_timing():
+    metrics.start_request()
+
+
+@fluxapp.after_request
+def add_timing_headers(response):
+    """Reports the per-stage timings and counts of the request."""
+    response.headers['Server-Timing'] = metrics.server_timing()
+    counts = metrics.request_counts()
+    if len(counts) > 0:
+        response.headers['X-Meteorflux-Counts'] = ', '.join(
+            '{0}={1}'.format(k, v) for k, v in sorted(counts.items()))
+    return response
+
+
 @fluxapp.route('/')
 def root():
     return fluxapp.send_static_file('index.html')
@@ -44,81 +63,103 @@ def flux():
     -------
     http://localhost:8000/api/flux?shower=PER&start=2012-08-01&stop=2012-08-02
     """
+    mydb = None
     try:
-        shower = request.args.get('shower')
-        start = time.Time(request.args.get('start'), scale='utc')
-        stop = time.Time(request.args.get('stop'), scale='utc')
-        year = request.args.get('year', default='', type=str)
-        avg = request.args.get('avg', default='false', type=str)
-        min_interval = request.args.get('min_interval', default=1, type=float)
-        max_interval = request.args.get('max_interval', default=24, type=float)
-        min_meteors = request.args.get('min_meteors', default=20, type=int)
-        min_eca = request.args.get('min_eca', default=20000., type=float)
-        min_alt = request.args.get('min_alt', default=10, type=float)
-        gamma = request.args.get('gamma', default=1.5, type=float)
-        popindex = request.args.get('popindex', default=2.0, type=float)
-        ymax = request.args.get('ymax', default=None, type=float)
-
-        mydb = db.FluxDB()
-
-        years = year.split(',')
-        if avg == 'false' and len(years) == 1:
-            myprofile = profile.VideoProfile(mydb, shower, start, stop,
-                                           min_interval=min_interval,
-                                           max_interval=max_interval,
-                                           min_meteors=min_meteors,
-                                           min_eca=min_eca,
-                                           min_alt=min_alt,
-                                           gamma=gamma,
-                                           popindex=popindex,
-                                           ymax=ymax)
-            reponse = myprofile.get_response()
-        elif avg == 'false' and len(years) > 1:
-            sollon_start = util.sollon(start.datetime)
-            sollon_stop = util.sollon(stop.datetime)
-            profiles = []
-            for i, myyear in enumerate(years):
-                profiles.append(profile.AvgVideoProfile(mydb,
-                                           shower, [myyear],
-                                           sollon_start, sollon_stop,
-                                           min_interval=min_interval,
-                                           max_interval=max_interval,
-                                           min_meteors=min_meteors,
-                                           min_eca=min_eca,
-                                           min_alt=min_alt,
-                                           gamma=gamma,
-                                           popindex=popindex,
-                                           ymax=ymax,
-                                           marker=config.MARKERS[i]))
-            mygraph = graph.SolVideoGraph(profiles, ymax=ymax)
-            mygraph.plot()
-            reponse = {}
-            reponse['status'] = 'OK'
-            reponse['graph'] = mygraph.save()
-            reponse['flux'] = []
-        elif avg == 'true':
-            sollon_start = util.sollon(start.datetime)
-            sollon_stop = util.sollon(stop.datetime)
-            myprofile = profile.AvgVideoProfile(mydb,
-                                           shower, years,
-                                           sollon_start, sollon_stop,
-                                           min_interval=min_interval,
-                                           max_interval=max_interval,
-                                           min_meteors=min_meteors,
-                                           min_eca=min_eca,
-                                           min_alt=min_alt,
-                                           gamma=gamma,
-                                           popindex=popindex,
-                                           ymax=ymax)
-            reponse = myprofile.get_response()
-        else:
-            raise ValueError('Inconsistent parameters')
-
-        mydb.close()
+        with metrics.timer('flux'):
+            params = parse_flux_args(request.args)
+            reponse = cache.ResponseCache().get(params)
+            if reponse is None:
+                mydb = db.FluxDB(pooled=True)
+                reponse = compute_flux(mydb, params)
+                mydb.close()
         return json.jsonify(reponse)
     except ValueError as e:
         reponse = {'status':'ERROR',
                    'msg':'Invalid parameters.',
                    'debug':str(e)}
-        mydb.close()
+        if mydb is not None:
+            mydb.close()
         return json.jsonify(reponse)
+
+
+@fluxapp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Returns the latency histograms and counters of this process."""
+    return fluxapp.response_class(metrics.REGISTRY.to_prometheus(),
+                                  mimetype='text/plain; version=0.0.4')
+
+
+def parse_flux_args(args):
+    """Returns the /api/flux parameters as a dictionary of typed values.
+
+    Parameters
+    ----------
+    args : werkzeug MultiDict
+        Request arguments, e.g. `request.args`.
+    """
+    return {'shower': args.get('shower'),
+            'start': time.Time(args.get('start'), scale='utc'),
+            'stop': time.Time(args.get('stop'), scale='utc'),
+            'year': args.get('year', default='', type=str),
+            'avg': args.get('avg', default='false', type=str),
+            'min_interval': args.get('min_interval', default=1, type=float),
+            'max_interval': args.get('max_interval', default=24, type=float),
+            'min_meteors': args.get('min_meteors', default=20, type=int),
+            'min_eca': args.get('min_eca', default=20000., type=float),
+            'min_alt': args.get('min_alt', default=10, type=float),
+            'gamma': args.get('gamma', default=1.5, type=float),
+            'popindex': args.get('popindex', default=2.0, type=float),
+            'ymax': args.get('ymax', default=None, type=float)}
+
+
+def compute_flux(mydb, params):
+    """Computes the /api/flux response for parameters from `parse_flux_args`.
+
+    Returns
+    -------
+    dict
+    """
+    shower = params['shower']
+    start, stop = params['start'], params['stop']
+    avg = params['avg']
+    ymax = params['ymax']
+    binargs = {'min_interval': params['min_interval'],
+               'max_interval': params['max_interval'],
+               'min_meteors': params['min_meteors'],
+               'min_eca': params['min_eca'],
+               'min_alt': params['min_alt'],
+               'gamma': params['gamma'],
+               'popindex': params['popindex'],
+               'ymax': ymax}
+
+    years = params['year'].split(',')
+    if avg == 'false' and len(years) == 1:
+        myprofile = profile.VideoProfile(mydb, shower, start, stop, **binargs)
+        reponse = myprofile.get_response()
+    elif avg == 'false' and len(years) > 1:
+        sollon_start = util.sollon(start.datetime)
+        sollon_stop = util.sollon(stop.datetime)
+        profiles = []
+        for i, myyear in enumerate(years):
+            profiles.append(profile.AvgVideoProfile(mydb,
+                                       shower, [myyear],
+                                       sollon_start, sollon_stop,
+                                       marker=config.MARKERS[i],
+                                       **binargs))
+        mygraph = graph.SolVideoGraph(profiles, ymax=ymax)
+        mygraph.plot()
+        reponse = {}
+        reponse['status'] = 'OK'
+        reponse['graph'] = mygraph.save()
+        reponse['flux'] = []
+    elif avg == 'true':
+        sollon_start = util.sollon(start.datetime)
+        sollon_stop = util.sollon(stop.datetime)
+        myprofile = profile.AvgVideoProfile(mydb,
+                                       shower, years,
+                                       sollon_start, sollon_stop,
+                                       **binargs)
+        reponse = myprofile.get_response()
+    else:
+        raise ValueError('Inconsistent parameters')
+    return reponse
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Response cache for the flux web service.
+
+Responses are stored as JSON files in `config.CACHEDIR`, keyed by a hash
+of the parsed request parameters.  Files are shared by all the web app
+processes and are written by the pre-computation scheduler
+(see `precompute.py`).
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+from astropy import log
+
+from . import config
+
+
+class ResponseCache(object):
+    """File-backed cache mapping request parameters to JSON responses."""
+
+    def __init__(self, cachedir=config.CACHEDIR):
+        """
+        Parameters
+        ----------
+        cachedir : string
+            Directory in which the cached responses are stored.
+        """
+        self.cachedir = cachedir
+
+    def key(self, params):
+        """Returns the cache key for a dictionary of request parameters."""
+        blob = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha1(blob.encode('utf-8')).hexdigest()
+
+    def path(self, params):
+        """Returns the filename of the cache entry for `params`."""
+        return os.path.join(self.cachedir, self.key(params) + '.json')
+
+    def get(self, params):
+        """Returns the cached response for `params`, or None on a miss."""
+        try:
+            with open(self.path(params), 'r') as myfile:
+                return json.load(myfile)['response']
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def set(self, params, response):
+        """Stores `response` as the cached result for `params`.
+
+        The file is written under a temporary name and renamed into place,
+        such that concurrent readers never see a partially written entry.
+        """
+        if not os.path.isdir(self.cachedir):
+            os.makedirs(self.cachedir)
+        entry = {'params': params,
+                 'created': time.time(),
+                 'response': response}
+        fd, tmpname = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as myfile:
+            json.dump(entry, myfile, default=str)
+        os.rename(tmpname, self.path(params))
+        log.debug('Cached response {0}'.format(self.key(params)))
+
+    def delete(self, params):
+        """Removes the cache entry for `params`, if any."""
+        try:
+            os.remove(self.path(params))
+        except OSError:
+            pass
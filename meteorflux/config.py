@@ -16,8 +16,25 @@ else:
     TMPDIR_WWW = '/tmp'
 
 
+# Size of the per-process database connection pool of the web app
+DB_POOL_MIN = 1
+DB_POOL_MAX = 10
+
+# Queries slower than this many seconds are logged with their plan (None = off)
+SLOW_QUERY_THRESHOLD = None
+SLOW_QUERY_LOG = os.path.join(TMPDIR, 'meteorflux-slow-queries.log')
+
 # Database to use for unit tests
 DBINFO_TESTING = 'host=/var/run/postgresql dbname=testdb user=postgres'
+# Database to use for benchmarks (its flux table will be overwritten!)
+DBINFO_BENCHMARK = 'host=/var/run/postgresql dbname=benchdb user=postgres'
 DPI = 80  # Default DPI of graphs
 MARKERS = ['s', '^', 'o', 's', '^', 'o', 's', '^', 'o', 's', '^', 'o']
 
+# Directory holding the pre-computed /api/flux responses (see precompute.py)
+CACHEDIR = os.path.join(TMPDIR, 'meteorflux-cache')
+# Popular /api/flux views to pre-compute, given as dictionaries of request
+# arguments, e.g. {'shower': 'PER', 'start': '2015-08-10', 'stop': '2015-08-15'}
+PRECOMPUTE = []
+# Refresh the affected pre-computed views after each ingestion run?
+PRECOMPUTE_AFTER_INGEST = True
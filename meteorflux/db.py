@@ -2,7 +2,9 @@
 """
 import os
 import psycopg2
+import psycopg2.pool
 import psycopg2.extras
+import psycopg2.extensions
 from astropy import log
 
 try:
@@ -10,7 +12,59 @@ try:
 except ImportError:
     from io import StringIO
 
-from . import config
+from . import config, metrics, slowlog
+
+# Arguments of the profile functions in lib/functions.sql, given as
+# (name of the prepared statement, parameter types, placeholders).
+# Intervals are passed as a number of hours.
+PROFILE_FUNCTIONS = {
+    'VideoProfile': ('videoprofile_plan',
+                     'text, timestamp, timestamp, integer, float, float, '
+                     'float, float, float, float, float',
+                     "%s, %s::timestamp, %s::timestamp, %s, %s, "
+                     "%s * interval '1 hour', %s * interval '1 hour', "
+                     "%s, %s, %s, %s"),
+    'SolVideoProfile': ('solvideoprofile_plan',
+                        'text, integer, numeric, numeric, integer, float, '
+                        'float, float, float, float, float, float',
+                        "%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s"),
+    'AvgVideoProfile': ('avgvideoprofile_plan',
+                        'text, integer[], float, float, integer, float, '
+                        'float, float, float, float, float, float',
+                        "%s, %s::int[], %s, %s, %s, %s, %s, %s, "
+                        "%s, %s, %s, %s"),
+}
+
+# Arguments used to warm up the profile functions on a new connection;
+# the empty shower code ensures no data is read.
+WARMUP_ARGUMENTS = {
+    'VideoProfile': ('', '2000-01-01', '2000-01-02',
+                     1, 1., 1., 24., 10., 0., 1.5, 2.),
+    'SolVideoProfile': ('', 2000, 0., 1., 1, 1., 1., 24., 10., 0., 1.5, 2.),
+    'AvgVideoProfile': ('', [2000], 0., 1., 1, 1., 1., 24., 10., 0., 1.5, 2.),
+}
+
+_pools = {}
+
+
+class FluxConnection(psycopg2.extensions.connection):
+    """Connection which remembers whether the profile statements were
+    prepared on it."""
+    prepared = False
+
+
+def get_pool(dbinfo):
+    """Returns the connection pool of this process for `dbinfo`."""
+    key = (os.getpid(), dbinfo)
+    try:
+        return _pools[key]
+    except KeyError:
+        _pools[key] = psycopg2.pool.ThreadedConnectionPool(
+                                        config.DB_POOL_MIN,
+                                        config.DB_POOL_MAX,
+                                        dbinfo,
+                                        connection_factory=FluxConnection)
+        return _pools[key]
 
 
 class FluxDB(object):
@@ -18,7 +72,10 @@ class FluxDB(object):
     def __init__(self,
                  dbinfo=config.DBINFO,
                  prefix='',
-                 autocommit=True):
+                 autocommit=True,
+                 slow_query_threshold=config.SLOW_QUERY_THRESHOLD,
+                 slow_query_log=config.SLOW_QUERY_LOG,
+                 pooled=False):
         """Constructor
 
         Parameters
@@ -28,22 +85,66 @@ class FluxDB(object):
 
         autocommit : boolean
             If true, changes will be commited on each operation.
+
+        slow_query_threshold : float [seconds]
+            Queries taking longer are logged along with their execution plan.
+            Set to None to disable the slow-query log.
+
+        slow_query_log : string
+            Filename of the slow-query log.
+
+        pooled : boolean
+            If true, the connection is checked out from a per-process pool
+            and returned to it by `close()`.  The profile functions are
+            prepared (and warmed up) once per pooled connection.
         """
-        self.conn = psycopg2.connect(dbinfo)
+        self.pool = None
+        if pooled:
+            self.pool = get_pool(dbinfo)
+            self.conn = self.pool.getconn()
+        else:
+            self.conn = psycopg2.connect(dbinfo)
         self.cur = self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         self.prefix = prefix
         self.autocommit = autocommit
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_query_log = slow_query_log
 
         self.fluxtable = self.prefix+'flux'
 
+        if pooled and not self.conn.prepared:
+            self.prepare()
+
     def __del__(self):
         """Destructor"""
         self.close()
 
     def close(self):
-        """Close the database connection."""
+        """Close the database connection, or return it to the pool."""
+        if getattr(self, 'conn', None) is None:
+            return
         self.cur.close()
-        self.conn.close()
+        if self.pool is not None:
+            self.pool.putconn(self.conn)
+        else:
+            self.conn.close()
+        self.conn = None
+
+    def prepare(self):
+        """Prepares the profile function calls as server-side statements.
+
+        Each function is also executed once, such that plpgsql has compiled
+        it and planned its query before the first real request arrives.
+        """
+        for function, (name, types, placeholders) in PROFILE_FUNCTIONS.items():
+            params = placeholders % tuple('${0}'.format(i + 1)
+                               for i in range(placeholders.count('%s')))
+            self.cur.execute('PREPARE {0} ({1}) AS SELECT * FROM {2}({3})'.format(
+                                                name, types, function, params))
+        self.conn.prepared = True
+        for function, arguments in WARMUP_ARGUMENTS.items():
+            self.profile(function, arguments)
+        self.commit()
 
     ################
     # DATA QUERYING
@@ -51,13 +152,57 @@ class FluxDB(object):
 
     def query(self, sql, arguments=()):
         try:
-            self.cur.execute(sql, arguments)
-            return self.cur.fetchall()
+            with metrics.timer('query') as timer:
+                self.cur.execute(sql, arguments)
+                result = self.cur.fetchall()
+            metrics.count('rows', len(result))
         except psycopg2.ProgrammingError as e:
             log.error('Query failed [{0}] with error message[{1}]'.format(
                                 self.cur.query, e))
             self.rollback()
             return None
+        if (self.slow_query_threshold is not None
+                and timer.seconds > self.slow_query_threshold):
+            self.log_slow_query(sql, arguments, timer.seconds)
+        return result
+
+    def profile(self, function, arguments):
+        """Returns the result of a profile function in lib/functions.sql.
+
+        The prepared statement is used if it exists on this connection.
+
+        Parameters
+        ----------
+        function : str
+            'VideoProfile', 'SolVideoProfile' or 'AvgVideoProfile'.
+
+        arguments : tuple
+            Arguments of the function, with intervals in hours.
+        """
+        name, types, placeholders = PROFILE_FUNCTIONS[function]
+        if getattr(self.conn, 'prepared', False):
+            sql = 'EXECUTE {0} ({1})'.format(name, placeholders)
+        else:
+            sql = 'SELECT * FROM {0}({1})'.format(function, placeholders)
+        return self.query(sql, arguments)
+
+    def log_slow_query(self, sql, arguments, seconds):
+        """Writes a query to the slow-query log, along with its plan.
+
+        The plan is obtained by running the query again under
+        EXPLAIN (ANALYZE, BUFFERS), which is only done for read-only
+        SELECT statements and the prepared profile statements.
+        """
+        plan = None
+        if sql.lstrip().upper().startswith(('SELECT', 'EXECUTE')):
+            try:
+                self.cur.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) '
+                                 + sql, arguments)
+                plan = self.cur.fetchone()[0]
+            except psycopg2.Error as e:
+                log.warning('Could not explain slow query: {0}'.format(e))
+                self.rollback()
+        slowlog.record(sql, arguments, seconds, plan, self.slow_query_log)
 
     #def query_json(self, sql, arguments=(,)):
     #    result = self.query(sql, arguments)
@@ -12,7 +12,7 @@ from astropy import log
 from astropy.time import Time
 import os
 
-from . import config, util
+from . import config, util, metrics
 
 params = {'backend': 'Agg',
           'axes.labelsize': 18,
@@ -44,15 +44,18 @@ class BaseGraph(object):
                                              suffix='.'+format,
                                              dir=tmpdir,
                                              delete=False)
-        self.fig.savefig(myfile, format=format, dpi=dpi)
-        
-        myfile2 = myfile.name.replace('png', 'pdf')
-        self.fig.savefig(myfile2, format='pdf', dpi=dpi)
+        with metrics.timer('save'):
+            self.fig.savefig(myfile, format=format, dpi=dpi)
+
+            myfile2 = myfile.name.replace('png', 'pdf')
+            self.fig.savefig(myfile2, format='pdf', dpi=dpi)
+        metrics.count('bytes_written',
+                      myfile.tell() + os.path.getsize(myfile2))
 
+        plt.close(self.fig)
         if web:
-            return config.TMPDIR_WWW+'/'+os.path.basename(myfile.name)
             myfile.close()
-            plt.close()
+            return config.TMPDIR_WWW+'/'+os.path.basename(myfile.name)
         else:
             return myfile
 
@@ -129,6 +132,7 @@ class VideoGraph(BaseGraph):
         self.ymax = ymax
 
     
+    @metrics.timed('plot')
     def plot(self):
         self.setup_axes()
 
@@ -279,6 +283,7 @@ class SolVideoGraph(BaseGraph):
         self.ymax = ymax
 
     
+    @metrics.timed('plot')
     def plot(self):
         self.setup_axes()
         collections = []
@@ -10,7 +10,7 @@ import zipfile
 import datetime
 from astropy import log
 
-from . import db
+from . import db, metrics
 
 ##########
 # CLASSES
@@ -171,20 +171,69 @@ def ingest_zip(path, mydb, remove_old=True):
     # Make sure any previous version of this dataset is removed
     if remove_old:
         mydb.remove_dataset(myzip.dataset_id)
-    mydb.ingest_json(myzip.get_json())
+    with metrics.timer('parse', metrics.INGEST_SECONDS) as parse_timer:
+        data = myzip.get_json()
+    myzip.coverage = get_coverage(data)
+    with metrics.timer('copy', metrics.INGEST_SECONDS) as copy_timer:
+        mydb.ingest_json(data)
+    metrics.count('ingest_rows', len(data))
+    myzip.metrics = {'rows': len(data),
+                     'parse_seconds': parse_timer.seconds,
+                     'copy_seconds': copy_timer.seconds,
+                     'rows_per_second': len(data) / max(parse_timer.seconds
+                                                        + copy_timer.seconds,
+                                                        1e-6)}
+    log.info("{0}: {rows} rows, parse {parse_seconds:.2f}s, "
+             "copy {copy_seconds:.2f}s, {rows_per_second:.0f} rows/s".format(
+                                        myzip.dataset_id, **myzip.metrics))
     return myzip
 
 def ingest_dir(path, mydb, remove_old=True):
     """Ingest a directory of MetRec zipped flux files.
 
     Parameters are identical to ingest_zip().
+
+    Returns
+    -------
+    List of MetRecData objects that were ingested.
     """
+    ingested = []
     for filename in os.listdir(path):
         full_path = os.path.join(path, filename)
         if not os.path.isdir(full_path):
             try:
                 myzip = ingest_zip(full_path, mydb, remove_old)
+                ingested.append(myzip)
             except zipfile.BadZipfile:
                 log.warning("%s is not a valid ZIP file." % filename)
             except Exception as e:
                 log.error('Unexpected error {0}'.format(e))    
+    return ingested
+
+def get_coverage(json):
+    """Summarizes the time and solar longitude range covered per shower.
+
+    Parameters
+    ----------
+    json : a list of dictionaries, as returned by MetRecData.get_json()
+
+    Returns
+    -------
+    A dictionary of the form {shower: {'start': ..., 'stop': ...,
+    'sollong_min': ..., 'sollong_max': ..., 'rows': ...}}.
+    """
+    coverage = {}
+    for row in json:
+        try:
+            cov = coverage[row['shower']]
+        except KeyError:
+            cov = {'start': row['time'], 'stop': row['time'],
+                   'sollong_min': row['sollong'], 'sollong_max': row['sollong'],
+                   'rows': 0}
+            coverage[row['shower']] = cov
+        cov['start'] = min(cov['start'], row['time'])
+        cov['stop'] = max(cov['stop'], row['time'])
+        cov['sollong_min'] = min(cov['sollong_min'], row['sollong'])
+        cov['sollong_max'] = max(cov['sollong_max'], row['sollong'])
+        cov['rows'] += 1
+    return coverage
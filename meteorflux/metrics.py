@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-stage latency instrumentation.
+
+Stages of the web service and the ingestion (database queries, profile
+computation, plotting, saving, parsing, COPY) are timed using `timer()`.
+Durations are accumulated in process-wide latency histograms which can be
+exported in the Prometheus text format, and in a per-request record which
+the web app returns in a `Server-Timing` header.
+
+Note that each web app worker process keeps its own histograms.
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+STAGE_SECONDS = 'meteorflux_stage_seconds'
+INGEST_SECONDS = 'meteorflux_ingest_seconds'
+
+# Upper bounds of the histogram buckets [seconds]
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {STAGE_SECONDS: 'Time spent in each stage of a web request.',
+        INGEST_SECONDS: 'Time spent in each stage of the ingestion.',
+        'meteorflux_rows_total': 'Number of rows returned by the database.',
+        'meteorflux_bins_total': 'Number of flux bins produced.',
+        'meteorflux_bytes_written_total': 'Number of bytes of graphs written.',
+        'meteorflux_ingest_rows_total': 'Number of flux records ingested.'}
+
+
+class Histogram(object):
+    """Latency histogram with fixed bucket boundaries."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry(object):
+    """Thread-safe collection of histograms and counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, value, **labels):
+        """Adds `value` to the histogram `name` with the given labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            try:
+                self.histograms[key].observe(value)
+            except KeyError:
+                self.histograms[key] = Histogram()
+                self.histograms[key].observe(value)
+
+    def inc(self, name, value=1, **labels):
+        """Increments the counter `name` with the given labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def to_prometheus(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name in sorted(set(k[0] for k in self.histograms)):
+                lines.extend(_header(name, 'histogram'))
+                for key in sorted(k for k in self.histograms if k[0] == name):
+                    hist = self.histograms[key]
+                    cumulative = 0
+                    bounds = [repr(b) for b in hist.buckets] + ['+Inf']
+                    for bound, count in zip(bounds, hist.counts):
+                        cumulative += count
+                        labels = key[1] + (('le', bound),)
+                        lines.append('{0}_bucket{1} {2}'.format(
+                                        name, _labels(labels), cumulative))
+                    lines.append('{0}_sum{1} {2!r}'.format(
+                                    name, _labels(key[1]), hist.sum))
+                    lines.append('{0}_count{1} {2}'.format(
+                                    name, _labels(key[1]), hist.count))
+            for name in sorted(set(k[0] for k in self.counters)):
+                lines.extend(_header(name, 'counter'))
+                for key in sorted(k for k in self.counters if k[0] == name):
+                    lines.append('{0}{1} {2}'.format(
+                                    name, _labels(key[1]), self.counters[key]))
+        return '\n'.join(lines) + '\n'
+
+
+def _header(name, kind):
+    return ['# HELP {0} {1}'.format(name, HELP.get(name, name)),
+            '# TYPE {0} {1}'.format(name, kind)]
+
+
+def _labels(labels):
+    if len(labels) == 0:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(k, v) for k, v in labels) + '}'
+
+
+REGISTRY = Registry()
+
+# Timings and counts of the request being handled by the current thread
+_request = threading.local()
+
+
+def start_request():
+    """Resets the per-request record of the current thread."""
+    _request.timings = []
+    _request.counts = {}
+
+
+class Timer(object):
+    """Result of a `timer()` block; `seconds` is set on exit."""
+    seconds = None
+
+
+@contextmanager
+def timer(stage, metric=STAGE_SECONDS):
+    """Context manager which times a stage.
+
+    Parameters
+    ----------
+    stage : string
+        Name of the stage, e.g. 'query' or 'plot'.
+
+    metric : string
+        Name of the histogram in which the duration is recorded.
+    """
+    result = Timer()
+    start = time.time()
+    try:
+        yield result
+    finally:
+        result.seconds = time.time() - start
+        REGISTRY.observe(metric, result.seconds, stage=stage)
+        timings = getattr(_request, 'timings', None)
+        if timings is not None:
+            timings.append((stage, result.seconds))
+
+
+def timed(stage):
+    """Decorator which times each call of a function as `stage`."""
+    def decorator(f):
+        @wraps(f)
+        def wrapped_function(*args, **kwargs):
+            with timer(stage):
+                return f(*args, **kwargs)
+        return wrapped_function
+    return decorator
+
+
+def count(name, value, stage=None):
+    """Increments counter `name` (e.g. 'rows', 'bins', 'bytes_written')."""
+    labels = {} if stage is None else {'stage': stage}
+    REGISTRY.inc('meteorflux_{0}_total'.format(name), value, **labels)
+    counts = getattr(_request, 'counts', None)
+    if counts is not None:
+        counts[name] = counts.get(name, 0) + value
+
+
+def server_timing():
+    """Returns the current request's timings as a Server-Timing header value.
+
+    Repeated stages (e.g. several queries) are summed.
+    """
+    totals = []
+    for stage, seconds in getattr(_request, 'timings', []):
+        for item in totals:
+            if item[0] == stage:
+                item[1] += seconds
+                break
+        else:
+            totals.append([stage, seconds])
+    return ', '.join('{0};dur={1:.1f}'.format(stage, 1000. * seconds)
+                     for stage, seconds in totals)
+
+
+def request_counts():
+    """Returns the current request's counts, e.g. {'rows': 120, 'bins': 30}."""
+    return dict(getattr(_request, 'counts', {}))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Pre-compute popular flux profiles and graphs into the response cache.
+
+The views to pre-compute are dictionaries of /api/flux request arguments,
+listed in `config.PRECOMPUTE` or in a JSON file.  They are computed through
+the same code path as the web service, such that a cached response is
+identical to the one the first visitor would have obtained.
+"""
+import json
+from astropy import log
+from werkzeug.datastructures import MultiDict
+
+from . import app, cache, config, db, util
+
+
+def load_entries(filename=None):
+    """Returns the list of views to pre-compute.
+
+    Parameters
+    ----------
+    filename : string (optional)
+        JSON file containing a list of request argument dictionaries.
+        Defaults to `config.PRECOMPUTE`.
+    """
+    if filename is None:
+        return list(config.PRECOMPUTE)
+    with open(filename, 'r') as myfile:
+        return json.load(myfile)
+
+
+def is_affected(params, coverage):
+    """Returns True if newly ingested data overlaps with a cached view.
+
+    Parameters
+    ----------
+    params : dict
+        Parsed request parameters, as returned by `app.parse_flux_args`.
+
+    coverage : dict
+        Data coverage per shower, as returned by `metrec.get_coverage`.
+    """
+    try:
+        cov = coverage[params['shower']]
+    except KeyError:
+        return False
+    years = params['year'].split(',')
+    if params['avg'] == 'false' and len(years) == 1:
+        return (cov['start'] <= params['stop'].datetime
+                and cov['stop'] >= params['start'].datetime)
+    # Solar longitude profiles, which select data by year and sollong
+    if (str(cov['start'].year) not in years
+            and str(cov['stop'].year) not in years):
+        return False
+    sollon_start = util.sollon(params['start'].datetime)
+    sollon_stop = util.sollon(params['stop'].datetime)
+    return (cov['sollong_min'] <= sollon_stop
+            and cov['sollong_max'] >= sollon_start)
+
+
+def precompute(entries, mydb=None, mycache=None):
+    """Computes the responses for `entries` and stores them in the cache.
+
+    Parameters
+    ----------
+    entries : list of dict
+        Request arguments of the views to compute.
+
+    mydb : FluxDB object (optional)
+        Database to query, a new connection is opened if not given.
+
+    mycache : ResponseCache object (optional)
+
+    Returns
+    -------
+    Number of views that were cached.
+    """
+    if mycache is None:
+        mycache = cache.ResponseCache()
+    own_db = mydb is None
+    if own_db:
+        mydb = db.FluxDB()
+    count = 0
+    for entry in entries:
+        try:
+            params = app.parse_flux_args(MultiDict(entry))
+            response = app.compute_flux(mydb, params)
+        except ValueError as e:
+            log.error('Cannot pre-compute {0}: {1}'.format(entry, e))
+            continue
+        mycache.set(params, response)
+        count += 1
+    if own_db:
+        mydb.close()
+    log.info('Pre-computed {0} views'.format(count))
+    return count
+
+
+def refresh_changed(datasets, entries=None, mydb=None, mycache=None):
+    """Re-computes the cached views affected by an ingestion run.
+
+    Parameters
+    ----------
+    datasets : list of MetRecData objects
+        The datasets ingested, as returned by `metrec.ingest_dir`.
+
+    entries : list of dict (optional)
+        Views to consider, defaults to `config.PRECOMPUTE`.
+
+    Returns
+    -------
+    Number of views that were re-computed.
+    """
+    if entries is None:
+        entries = load_entries()
+    changed = []
+    for entry in entries:
+        try:
+            params = app.parse_flux_args(MultiDict(entry))
+        except ValueError as e:
+            log.error('Invalid pre-compute entry {0}: {1}'.format(entry, e))
+            continue
+        for dataset in datasets:
+            if is_affected(params, dataset.coverage):
+                changed.append(entry)
+                break
+    if len(changed) == 0:
+        return 0
+    return precompute(changed, mydb=mydb, mycache=mycache)
@@ -6,7 +6,7 @@ from astropy import log
 from astropy.time import Time
 import copy
 
-from . import config, graph
+from . import config, graph, metrics
 
 ############
 # CONSTANTS
@@ -28,6 +28,14 @@ class BaseProfile(object):
         self.fluxdb = fluxdb
         self.ymax = ymax
 
+    def _fetch(self, function, arguments):
+        """Runs a profile function, recording its duration and number of bins."""
+        with metrics.timer('profile'):
+            fluxes = self.fluxdb.profile(function, arguments)
+        if fluxes is not None:
+            metrics.count('bins', len(fluxes))
+        return fluxes
+
     def field(self, key):
         """Returns a data field"""
         return np.array([row[key] for row in self.fluxes])
@@ -134,21 +142,13 @@ class VideoProfile(BaseProfile):
 
         self.popindex = popindex
         self.gamma = gamma
-        self.fluxes = self.fluxdb.query("""SELECT * FROM
-                                    VideoProfile(%s,
-                                                 %s::timestamp,
-                                                 %s::timestamp,
-                                                 %s, %s,
-                                                 '%s hours'::interval,
-                                                 '%s hours'::interval,
-                                                 %s, %s, %s, %s)
-                                """, (shower, 
-                                      self.start.isot, 
-                                      self.stop.isot,
-                                      min_meteors, min_eca,
-                                      min_interval, max_interval,
-                                      min_alt, min_eca_station,
-                                      gamma, popindex, ))
+        self.fluxes = self._fetch('VideoProfile', (shower,
+                                                   self.start.isot,
+                                                   self.stop.isot,
+                                                   min_meteors, min_eca,
+                                                   min_interval, max_interval,
+                                                   min_alt, min_eca_station,
+                                                   gamma, popindex, ))
 
 
     def graph(self):
@@ -229,18 +229,12 @@ class SolVideoProfile(BaseProfile):
             #self.label = '{0} {1}'.format(shower, year)
             self.label = str(year)
         self.marker = marker
-        self.fluxes = self.fluxdb.query("""SELECT * FROM
-                                    SolVideoProfile(%s,
-                                                 %s, %s, %s,
-                                                 %s, %s,
-                                                 %s, %s,
-                                                 %s, %s, %s, %s)
-                                """, (shower, 
-                                      year, start, stop,
-                                      min_meteors, min_eca,
-                                      min_interval, max_interval,
-                                      min_alt, min_eca_station,
-                                      gamma, popindex, ))
+        self.fluxes = self._fetch('SolVideoProfile', (shower,
+                                                      year, start, stop,
+                                                      min_meteors, min_eca,
+                                                      min_interval, max_interval,
+                                                      min_alt, min_eca_station,
+                                                      gamma, popindex, ))
 
 
     def graph(self):
@@ -322,18 +316,12 @@ class AvgVideoProfile(BaseProfile):
             #self.label = '{0} {1}'.format(shower, year)
             self.label = shower
         self.marker = marker
-        self.fluxes = self.fluxdb.query("""SELECT * FROM
-                                    AvgVideoProfile(%s,
-                                                 %s::int[], %s, %s,
-                                                 %s, %s,
-                                                 %s, %s,
-                                                 %s, %s, %s, %s)
-                                """, (shower, 
-                                      years, start, stop,
-                                      min_meteors, min_eca,
-                                      min_interval, max_interval,
-                                      min_alt, min_eca_station,
-                                      gamma, popindex, ))
+        self.fluxes = self._fetch('AvgVideoProfile', (shower,
+                                                      years, start, stop,
+                                                      min_meteors, min_eca,
+                                                      min_interval, max_interval,
+                                                      min_alt, min_eca_station,
+                                                      gamma, popindex, ))
 
 
     def graph(self):
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Slow-query log.
+
+When `FluxDB` is given a `slow_query_threshold`, queries which take longer
+are written to a rotating log file as one JSON document per line, holding
+the SQL, its arguments, the duration and the `EXPLAIN (ANALYZE, BUFFERS)`
+plan.  `summarize()` groups the logged profile function calls by their
+parameter shape, i.e. the shower and the width of the requested range.
+"""
+import re
+import json
+import glob
+import logging
+import datetime
+import numpy as np
+from logging.handlers import RotatingFileHandler
+
+from . import config
+
+# Rotate the log file after 10 MB, keeping 5 old files
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+# Profile function names, by the lower-case name used in prepared statements
+FUNCTIONS = {'videoprofile': 'VideoProfile',
+             'solvideoprofile': 'SolVideoProfile',
+             'avgvideoprofile': 'AvgVideoProfile'}
+
+_loggers = {}
+
+
+def get_logger(filename=config.SLOW_QUERY_LOG):
+    """Returns a logger writing to the rotating file `filename`."""
+    try:
+        return _loggers[filename]
+    except KeyError:
+        logger = logging.getLogger('meteorflux.slowquery.{0}'.format(
+                                                            len(_loggers)))
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(RotatingFileHandler(filename, maxBytes=MAX_BYTES,
+                                              backupCount=BACKUP_COUNT))
+        _loggers[filename] = logger
+        return logger
+
+
+def record(sql, arguments, seconds, plan, filename=config.SLOW_QUERY_LOG):
+    """Writes a slow query to the log."""
+    entry = {'date': datetime.datetime.utcnow().isoformat(),
+             'sql': ' '.join(sql.split()),
+             'arguments': arguments,
+             'seconds': seconds,
+             'plan': plan}
+    get_logger(filename).info(json.dumps(entry, default=str))
+
+
+def read_entries(filename=config.SLOW_QUERY_LOG):
+    """Returns the entries of a log file and its rotated predecessors."""
+    entries = []
+    for path in sorted(glob.glob(filename + '*')):
+        with open(path, 'r') as myfile:
+            for line in myfile:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def _bucket(width, unit):
+    """Rounds a range width up to the next power of two, e.g. '<=4d'."""
+    if width <= 0:
+        return '0{0}'.format(unit)
+    return '<={0:g}{1}'.format(2 ** np.ceil(np.log2(width)), unit)
+
+
+def parameter_shape(entry):
+    """Returns the (function, shower, range) shape of a logged query.
+
+    Queries which are not profile function calls are grouped by their SQL.
+    """
+    match = re.search(r'(?:FROM|EXECUTE)\s+(\w*profile)(?:_plan)?\s*\(',
+                      entry['sql'], re.IGNORECASE)
+    if match is None or match.group(1).lower() not in FUNCTIONS:
+        return (entry['sql'][:60], '', '')
+    function = FUNCTIONS[match.group(1).lower()]
+    args = entry['arguments']
+    try:
+        if function == 'VideoProfile':
+            start = datetime.datetime.strptime(args[1][:19].replace(' ', 'T'),
+                                               '%Y-%m-%dT%H:%M:%S')
+            stop = datetime.datetime.strptime(args[2][:19].replace(' ', 'T'),
+                                              '%Y-%m-%dT%H:%M:%S')
+            width = _bucket((stop - start).total_seconds() / 86400., 'd')
+        elif function == 'AvgVideoProfile':
+            width = '{0}yr {1}'.format(len(args[1]),
+                                       _bucket(float(args[3]) - float(args[2]),
+                                               'deg'))
+        else:
+            width = _bucket(float(args[3]) - float(args[2]), 'deg')
+    except (IndexError, TypeError, ValueError):
+        width = '?'
+    return (function, args[0], width)
+
+
+def summarize(entries):
+    """Groups entries by parameter shape, worst total duration first.
+
+    Returns
+    -------
+    List of (shape, count, mean seconds, max seconds) tuples.
+    """
+    groups = {}
+    for entry in entries:
+        groups.setdefault(parameter_shape(entry), []).append(entry['seconds'])
+    summary = [(shape, len(seconds), np.mean(seconds), np.max(seconds))
+               for shape, seconds in groups.items()]
+    return sorted(summary, key=lambda row: -row[1] * row[2])
@@ -41,4 +41,21 @@ def test_metrec_ingest_v11():
         metrec.ingest_zip(zipfile, mydb)
         # The ZIP file contains 2459 flux records
         #count = mydb.query('SELECT COUNT(*) FROM flux')[0][0]
-        #assert(count == 2459)
\ No newline at end of file
+        #assert(count == 2459)
+def test_prepared_profiles():
+    """Pooled connections use prepared statements with identical results."""
+    with tempdb() as mydb:
+        zipfile = os.path.join(PATH, 'data', '20130722_ORION1.zip')
+        metrec.ingest_zip(zipfile, mydb)
+        arguments = ('SPO', '2013-07-22T12:00:00', '2013-07-23T12:00:00',
+                     5, 20000., 1., 24., 10., -0.1, 1.5, 2.2)
+        expected = mydb.profile('VideoProfile', arguments)
+        assert len(expected) > 0
+        pooled = db.FluxDB(config.DBINFO_TESTING, pooled=True)
+        assert pooled.conn.prepared
+        assert pooled.profile('VideoProfile', arguments) == expected
+        pooled.close()
+        # The connection is re-used without preparing it again
+        pooled = db.FluxDB(config.DBINFO_TESTING, pooled=True)
+        assert pooled.conn.prepared
+        pooled.close()
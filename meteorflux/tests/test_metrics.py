@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests the latency instrumentation."""
+from .. import metrics
+from .. import fluxapp
+
+
+def test_histogram_export():
+    """Histograms are exported as cumulative Prometheus buckets."""
+    registry = metrics.Registry()
+    registry.observe('test_seconds', 0.003, stage='query')
+    registry.observe('test_seconds', 2.0, stage='query')
+    registry.inc('test_rows_total', 5)
+    text = registry.to_prometheus()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{stage="query",le="0.005"} 1' in text
+    assert 'test_seconds_bucket{stage="query",le="+Inf"} 2' in text
+    assert 'test_seconds_count{stage="query"} 2' in text
+    assert 'test_rows_total 5' in text
+
+
+def test_server_timing():
+    """Repeated stages are summed in the Server-Timing header."""
+    metrics.start_request()
+    with metrics.timer('query'):
+        pass
+    with metrics.timer('query'):
+        pass
+    metrics.count('rows', 3)
+    assert metrics.server_timing().startswith('query;dur=')
+    assert metrics.server_timing().count('query') == 1
+    assert metrics.request_counts() == {'rows': 3}
+
+
+def test_metrics_endpoint():
+    client = fluxapp.test_client()
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert 'Server-Timing' in response.headers
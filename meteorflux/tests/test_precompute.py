@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests the pre-computation of cached flux views."""
+import os
+import tempfile
+
+from .. import cache
+from .. import metrec
+from .. import precompute
+from .test_db import tempdb, PATH
+
+ENTRY = {'shower': 'SPO',
+         'start': '2013-07-22T12:00:00',
+         'stop': '2013-07-23T12:00:00',
+         'min_meteors': '5'}
+
+
+def test_precompute_refresh():
+    """Views are cached, and refreshed only if the ingested data overlaps."""
+    mycache = cache.ResponseCache(tempfile.mkdtemp())
+    with tempdb() as mydb:
+        zipfile = os.path.join(PATH, 'data', '20130722_ORION1.zip')
+        myzip = metrec.ingest_zip(zipfile, mydb)
+        assert precompute.precompute([ENTRY], mydb, mycache) == 1
+        params = precompute.app.parse_flux_args(
+                                precompute.MultiDict(ENTRY))
+        assert mycache.get(params)['status'] == 'OK'
+        # The ingested data overlaps with the view
+        assert precompute.refresh_changed([myzip], [ENTRY],
+                                          mydb, mycache) == 1
+        # A view of a different year is left alone
+        other = dict(ENTRY, start='2014-07-22', stop='2014-07-23')
+        assert precompute.refresh_changed([myzip], [other],
+                                          mydb, mycache) == 0
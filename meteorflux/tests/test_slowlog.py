@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tests the slow-query log."""
+import os
+import tempfile
+
+from .. import slowlog
+from .test_db import tempdb
+
+
+def test_slow_query_log():
+    """Queries over the threshold are logged with their plan and shape."""
+    filename = os.path.join(tempfile.mkdtemp(), 'slow.log')
+    with tempdb() as mydb:
+        mydb.slow_query_threshold = 0.
+        mydb.slow_query_log = filename
+        mydb.query("""SELECT * FROM VideoProfile(%s, %s::timestamp,
+                      %s::timestamp, %s, %s, '%s hours'::interval,
+                      '%s hours'::interval, %s, %s, %s, %s)""",
+                   ('PER', '2013-07-22T12:00:00.000', '2013-07-25T12:00:00.000',
+                    20, 20000., 1., 24., 10., -0.1, 1.5, 2.2))
+    entries = slowlog.read_entries(filename)
+    assert len(entries) == 1
+    assert entries[0]['plan'][0]['Plan']['Node Type'] == 'Function Scan'
+    summary = slowlog.summarize(entries)
+    assert summary[0][0] == ('VideoProfile', 'PER', '<=4d')
+    assert summary[0][1] == 1
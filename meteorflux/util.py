@@ -109,7 +109,7 @@ def sollon(datetime):
         result = result + 2.0*np.pi
     
     # Return the result (DEGREES!)
-    return np.degrees(result)
+    return float(np.degrees(result))
 
 
 # Flask crossdomain decorator
@@ -11,6 +11,8 @@ from astropy import log
 
 from meteorflux import metrec
 from meteorflux import db
+from meteorflux import config
+from meteorflux import precompute
 
 #######
 # MAIN
@@ -34,8 +36,12 @@ if __name__ == '__main__':
 
         if os.path.isdir(path):
             log.info("%s is a directory, will ingest all *.zip files inside." % path)
-            metrec.ingest_dir(path, mydb, remove_old)
+            datasets = metrec.ingest_dir(path, mydb, remove_old)
         else:
-            myzip = metrec.ingest_zip(path, mydb, remove_old)
+            datasets = [metrec.ingest_zip(path, mydb, remove_old)]
 
         mydb.commit()
+
+        # Refresh the cached views which depend on the new data
+        if config.PRECOMPUTE_AFTER_INGEST:
+            precompute.refresh_changed(datasets, mydb=mydb)
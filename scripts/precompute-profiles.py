@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Pre-compute popular flux profiles into the web app's response cache.
+
+Usage: precompute-profiles.py [entries.json]
+
+Without argument, the views listed in `config.PRECOMPUTE` are computed.
+"""
+import sys
+from astropy import log
+
+from meteorflux import precompute
+
+#######
+# MAIN
+#######
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        entries = precompute.load_entries(sys.argv[1])
+    else:
+        entries = precompute.load_entries()
+
+    with log.log_to_file('precompute.log'):
+        precompute.precompute(entries)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Summarize the slow-query log by profile function and parameter shape.
+
+Usage: slow-queries.py [logfile]
+
+The log is written by FluxDB when `config.SLOW_QUERY_THRESHOLD` is set.
+Shapes are sorted by total time spent, worst first.
+"""
+import sys
+
+from meteorflux import config
+from meteorflux import slowlog
+
+#######
+# MAIN
+#######
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        filename = sys.argv[1]
+    else:
+        filename = config.SLOW_QUERY_LOG
+
+    entries = slowlog.read_entries(filename)
+    print('{0} slow queries in {1}\n'.format(len(entries), filename))
+    print('{0:20s} {1:8s} {2:16s} {3:>6s} {4:>9s} {5:>9s}'.format(
+                    'function', 'shower', 'range', 'count', 'mean [s]', 'max [s]'))
+    for shape, count, mean, maximum in slowlog.summarize(entries):
+        print('{0:20s} {1:8s} {2:16s} {3:6d} {4:9.3f} {5:9.3f}'.format(
+                    shape[0][:20], shape[1], shape[2], count, mean, maximum))